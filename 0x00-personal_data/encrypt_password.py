@@ -5,36 +5,156 @@ Module for password encryption functions.
 This module provides functions to hash passwords securely using the
 bcrypt library and to validate provided passwords against hashed
 passwords.
+
+The bcrypt work factor defaults to 12 and can be tuned through the
+``BCRYPT_ROUNDS`` environment variable. Every extra round doubles the
+time needed to hash (and to brute force) a password, so lower values
+are only meant for tests and seeding scripts.
+
+bcrypt itself is imported on first use, keeping imports of this module
+cheap for processes that never hash a password.
 """
 
-import bcrypt
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Tuple, Union
+
+# Default bcrypt work factor, read once at import time
+BCRYPT_ROUNDS: int = int(os.getenv('BCRYPT_ROUNDS', '12'))
+
+# Opt-in cache of verification results, see is_valid(cache=True).
+# Entries are keyed by a digest under a per-process secret so neither
+# the plain text password nor an unkeyed hash of it is kept in memory.
+VALID_CACHE_SIZE: int = 1024
+_valid_cache: "OrderedDict[bytes, bool]" = OrderedDict()
+_valid_cache_lock = threading.Lock()
+_valid_cache_secret = os.urandom(32)
+
+# Threads shared by hash_passwords_bulk and is_valid_many, one per core
+_BCRYPT_POOL = None
+_bcrypt_pool_lock = threading.Lock()
+
+
+def _to_bytes(password: Union[str, bytes]) -> bytes:
+    """Return the UTF-8 bytes of a password, as-is if already bytes."""
+    if isinstance(password, bytes):
+        return password
+    return password.encode('utf-8')
+
+
+def _bcrypt_pool():
+    """Return the bcrypt thread pool, created on first use."""
+    global _BCRYPT_POOL
+    if _BCRYPT_POOL is None:
+        with _bcrypt_pool_lock:
+            if _BCRYPT_POOL is None:
+                from concurrent.futures import ThreadPoolExecutor
 
+                _BCRYPT_POOL = ThreadPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    thread_name_prefix="bcrypt")
+    return _BCRYPT_POOL
 
-def hash_password(password: str) -> bytes:
+
+def _reset_bcrypt_pool() -> None:
+    """Forget the pool, its threads don't exist in a forked child."""
+    global _BCRYPT_POOL
+    _BCRYPT_POOL = None
+
+
+os.register_at_fork(after_in_child=_reset_bcrypt_pool)
+
+
+def hash_password(password: Union[str, bytes],
+                  rounds: int = BCRYPT_ROUNDS) -> bytes:
     """Hash a password with bcrypt and return the salted hash as a byte string.
 
     Args:
-        password (str): The password to be hashed.
+        password (Union[str, bytes]): The password to be hashed. Callers
+            hashing the same password repeatedly can pass it pre-encoded.
+        rounds (int): The bcrypt work factor. Defaults to BCRYPT_ROUNDS.
 
     Returns:
         bytes: A byte string representing the salted hash of the password.
     """
+    import bcrypt
+
     # Generate a salt
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds)
     # Hash the password with the salt
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+    hashed_password = bcrypt.hashpw(_to_bytes(password), salt)
     return hashed_password
 
 
-def is_valid(hashed_password: bytes, password: str) -> bool:
+def hash_passwords_bulk(passwords: Iterable[str],
+                        rounds: int = BCRYPT_ROUNDS) -> List[bytes]:
+    """Hash several passwords in parallel.
+
+    bcrypt releases the GIL while hashing, so the shared thread pool
+    spreads the work over all available cores.
+
+    Args:
+        passwords (Iterable[str]): The passwords to be hashed.
+        rounds (int): The bcrypt work factor. Defaults to BCRYPT_ROUNDS.
+
+    Returns:
+        List[bytes]: The salted hashes, in the same order as passwords.
+    """
+    return list(_bcrypt_pool().map(lambda pwd: hash_password(pwd, rounds),
+                                   passwords))
+
+
+def is_valid(hashed_password: bytes, password: Union[str, bytes],
+             cache: bool = False) -> bool:
     """Check if the provided password matches the hashed password.
 
     Args:
         hashed_password (bytes): The hashed password to check against.
-        password (str): The plain text password to validate.
+        password (Union[str, bytes]): The plain text password to validate.
+        cache (bool): Remember the result of this check so repeating it
+            skips bcrypt. Caching verification results changes the threat
+            model (a memory dump reveals which pairs were checked), so it
+            is disabled by default.
 
     Returns:
         bool: True if the password matches the hashed password,
               False otherwise.
     """
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+    import bcrypt
+
+    password_bytes = _to_bytes(password)
+    if not cache:
+        return bcrypt.checkpw(password_bytes, hashed_password)
+
+    key = hashlib.blake2b(hashed_password + b'|' + password_bytes,
+                          key=_valid_cache_secret, digest_size=16).digest()
+    with _valid_cache_lock:
+        result = _valid_cache.get(key)
+        if result is not None:
+            _valid_cache.move_to_end(key)
+            return result
+
+    result = bcrypt.checkpw(password_bytes, hashed_password)
+    with _valid_cache_lock:
+        _valid_cache[key] = result
+        if len(_valid_cache) > VALID_CACHE_SIZE:
+            _valid_cache.popitem(last=False)
+    return result
+
+
+def is_valid_many(pairs: Iterable[Tuple[bytes, str]]) -> List[bool]:
+    """Check several (hashed_password, password) pairs in parallel.
+
+    Each check is as slow as a single is_valid call, but bcrypt releases
+    the GIL so independent checks scale with the number of cores.
+
+    Args:
+        pairs (Iterable[Tuple[bytes, str]]): The hashed passwords and the
+            plain text passwords to validate against them.
+
+    Returns:
+        List[bool]: One result per pair, in the same order as pairs.
+    """
+    return list(_bcrypt_pool().map(lambda pair: is_valid(*pair), pairs))
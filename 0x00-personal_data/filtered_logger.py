@@ -5,25 +5,82 @@ This module contains functions to obfuscate log messages by redacting
 specified fields and a logging formatter for redaction.
 """
 
+import functools
 import logging
 import re
 import os
-import mysql.connector
-from typing import List
-from mysql.connector import Error
+import sys
+import threading
+import time
+from typing import List, Pattern, Tuple
 
-# Constant for PII fields
-PII_FIELDS: tuple = ("name", "email", "ssn", "password", "phone")
+# Constant for PII fields (interned, they are compared on every record)
+PII_FIELDS: tuple = tuple(sys.intern(field) for field in
+                          ("name", "email", "ssn", "password", "phone"))
+
+# Columns of the users table, in the order they are selected
+USER_COLUMNS: tuple = ("name", "email", "phone", "ssn", "password", "ip",
+                       "last_login", "user_agent")
+
+# Size of the connection pool used by get_db()
+POOL_SIZE: int = 8
+_POOL = None
+
+# Number of rows pulled from the database per round trip in main()
+FETCH_SIZE: int = 1000
+
+
+def _field_alternation(fields: Tuple[str, ...]) -> str:
+    """Return a regex alternation of fields with common prefixes factored.
+
+    The fields are laid out as a trie so the regex engine walks each
+    shared prefix once per position instead of retrying every field.
+    """
+    trie: dict = {}
+    for field in fields:
+        node = trie
+        for char in field:
+            node = node.setdefault(char, {})
+        node[''] = {}  # end-of-field marker
+
+    def _walk(node: dict) -> str:
+        branches = [re.escape(char) + _walk(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if '' in node else group
+
+    return _walk(trie)
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_filter(fields: Tuple[str, ...], separator: str) -> Pattern:
+    """Build (once per fields/separator pair) the redaction pattern."""
+    return re.compile(
+        rf'({_field_alternation(fields)})=[^ {re.escape(separator)}]*')
+
+
+def _replacement(redaction: str) -> str:
+    """Build a ``re.sub`` template keeping the field name (group 1).
+
+    A plain template lets ``re`` substitute without calling back into
+    Python for every match; backslashes in the redaction are escaped so
+    they are not read as group references.
+    """
+    return r'\g<1>=' + redaction.replace('\\', r'\\')
 
 
 def filter_datum(fields: List[str], redaction: str, message: str,
                  separator: str) -> str:
     """Obfuscates specified fields in log message with a redaction string."""
-    return re.sub(
-        rf'({"|".join(map(re.escape, fields))})=[^ {separator}]*',
-        lambda m: f"{m.group(0).split('=')[0]}={redaction}",
-        message
-    )
+    # str.__contains__ scans long PII-free messages much faster than re
+    if not any(f"{field}=" in message for field in fields):
+        return message
+    return _compile_filter(tuple(fields), separator).sub(
+        _replacement(redaction), message)
 
 
 class RedactingFormatter(logging.Formatter):
@@ -32,16 +89,58 @@ class RedactingFormatter(logging.Formatter):
     REDACTION = "***"
     FORMAT = "[HOLBERTON] %(name)s %(levelname)s %(asctime)-15s: %(message)s"
     SEPARATOR = ";"
+    # REDACTION is static, so its re.sub template is built once
+    _REPLACEMENT = _replacement(REDACTION)
 
     def __init__(self, fields: List[str]):
         super(RedactingFormatter, self).__init__(self.FORMAT)
         self.fields = fields
+        # fields never change for a formatter, so compile the pattern once
+        self._pattern = _compile_filter(tuple(fields), self.SEPARATOR)
+        # Substring checks reject PII-free messages before the regex runs
+        self._field_keys = tuple(f"{field}=" for field in fields)
+        # Per-thread (second, formatted time) of the last record seen
+        self._time_cache = threading.local()
+        # Whether FORMAT shows the time, checked once rather than per line
+        self._uses_time = self.usesTime()
+
+    def formatTime(self, record: logging.LogRecord,
+                   datefmt: str = None) -> str:
+        """Format the record time, reusing the text of the same second."""
+        if datefmt is not None:
+            return super().formatTime(record, datefmt)
+        cache = self._time_cache
+        second = int(record.created)
+        if getattr(cache, 'second', None) != second:
+            cache.second = second
+            cache.text = time.strftime(self.default_time_format,
+                                       self.converter(record.created))
+        return self.default_msec_format % (cache.text, record.msecs)
 
     def format(self, record: logging.LogRecord) -> str:
-        """Format the log record with redacted fields."""
-        record.msg = filter_datum(self.fields, self.REDACTION, record.msg,
-                                  self.SEPARATOR)
-        return super().format(record)
+        """Format the log record with redacted fields.
+
+        The record is shared by every handler it is routed to, so its
+        original message is restored once the formatted line is built.
+        """
+        original = record.msg
+        text = original if isinstance(original, str) else str(original)
+        # Most lines carry no key=value pair at all: one scan for '='
+        # rejects them before the per-field checks and the regex
+        if '=' in text and any(key in text for key in self._field_keys):
+            record.msg = self._pattern.sub(self._REPLACEMENT, text)
+        try:
+            if record.exc_info or record.exc_text or record.stack_info:
+                # Let logging.Formatter append the traceback / stack
+                return super().format(record)
+            # Apply FORMAT directly, skipping the checks of Formatter.format
+            # for the traceback and stack parts the record does not have
+            record.message = record.getMessage()
+            if self._uses_time:
+                record.asctime = self.formatTime(record)
+            return self._fmt % record.__dict__
+        finally:
+            record.msg = original
 
 
 def get_logger() -> logging.Logger:
@@ -63,23 +162,36 @@ def get_logger() -> logging.Logger:
     return logger
 
 
+def _get_pool():
+    """Create (on first use) and return the shared connection pool."""
+    global _POOL
+    if _POOL is None:
+        from mysql.connector import pooling
+
+        # Retrieve environment variables, with defaults
+        _POOL = pooling.MySQLConnectionPool(
+            pool_name="personal_data",
+            pool_size=POOL_SIZE,
+            user=os.getenv('PERSONAL_DATA_DB_USERNAME', 'root'),
+            password=os.getenv('PERSONAL_DATA_DB_PASSWORD', ''),
+            host=os.getenv('PERSONAL_DATA_DB_HOST', 'localhost'),
+            database=os.getenv('PERSONAL_DATA_DB_NAME')
+        )
+    return _POOL
+
+
 def get_db():
-    """Function that returns a connector to the database."""
+    """Function that returns a connector to the database.
 
-    # Retrieve environment variables, with defaults
-    username = os.getenv('PERSONAL_DATA_DB_USERNAME', 'root')
-    password = os.getenv('PERSONAL_DATA_DB_PASSWORD', '')
-    host = os.getenv('PERSONAL_DATA_DB_HOST', 'localhost')
-    database = os.getenv('PERSONAL_DATA_DB_NAME')
+    Connections come from a pool created on the first call, so repeated
+    callers reuse sockets instead of reconnecting; closing a connection
+    hands it back to the pool. mysql.connector is only imported here so
+    that using the formatter alone does not pay for loading it.
+    """
+    from mysql.connector import Error
 
     try:
-        # Create a connection to the database
-        connection = mysql.connector.connect(
-            user=username,
-            password=password,
-            host=host,
-            database=database
-        )
+        connection = _get_pool().get_connection()
 
         if connection.is_connected():
             return connection
@@ -93,43 +205,43 @@ def main():
     db_connection = get_db()
 
     if db_connection:
-        cursor = db_connection.cursor()
-        cursor.execute("SELECT * FROM users;")  # Query to retrieve all users
-        rows = cursor.fetchall()
+        # Unbuffered cursor so rows are streamed instead of materialized
+        cursor = db_connection.cursor(buffered=False)
+        # List the columns explicitly so row indexes match USER_COLUMNS
+        cursor.execute(
+            "SELECT {} FROM users;".format(", ".join(USER_COLUMNS)))
 
         # Define the filtered fields that need to be redacted
         filtered_fields = ['name', 'email', 'phone', 'ssn', 'password']
         redaction_format = "[HOLBERTON] user_data INFO {}: {};"
 
-        # Iterate through each row
-        for row in rows:
-            # Assuming row structure has the necessary columns:
-            # This is a placeholder for all user data; adapt as necessary
-            user_data = {
-                'name': row[0],  # Assuming these correspond to correct index
-                'email': row[1],
-                'phone': row[2],
-                'ssn': row[3],
-                'password': row[4],
-                'ip': row[5],
-                'last_login': row[6],
-                'user_agent': row[7],
-            }
-
-            # Format the time for demo purposes (replace with actual timestamp)
-            timestamp = "2023-10-01 10:10:10,000"  # Placeholder timestamp.
-
-            # Prepare message for redaction
-            message = "; ".join(
-                f"{key}={user_data[key]}" for key in user_data.keys()
-            )
-
-            # Redact sensitive data
-            redacted_message = filter_datum(
-                filtered_fields, "***", message, ";")
-
-            # Print final formatted message
-            print(redaction_format.format(timestamp, redacted_message))
+        # Whole PII columns are redacted, so their parts are constant and
+        # only the remaining columns are formatted for every row
+        parts = [f"{column}=***" if column in filtered_fields else None
+                 for column in USER_COLUMNS]
+        plain_columns = [(i, column) for i, column in enumerate(USER_COLUMNS)
+                         if column not in filtered_fields]
+
+        # Fetch rows in batches to keep memory bounded on large tables
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+
+            for row in rows:
+                # Row columns follow the order of USER_COLUMNS
+                for i, column in plain_columns:
+                    parts[i] = f"{column}={row[i]}"
+
+                # Format the time for demo purposes (replace with actual
+                # timestamp)
+                timestamp = "2023-10-01 10:10:10,000"  # Placeholder timestamp.
+
+                # Prepare the already redacted message
+                redacted_message = "; ".join(parts)
+
+                # Print final formatted message
+                print(redaction_format.format(timestamp, redacted_message))
 
         cursor.close()
         db_connection.close()
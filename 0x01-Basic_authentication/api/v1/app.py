@@ -4,6 +4,7 @@ Route module for the API
 """
 from os import getenv
 from api.v1.views import app_views
+from api.v1.auth.auth import Auth
 from flask import Flask, jsonify, abort, request
 from flask_cors import (CORS, cross_origin)
 import os
@@ -13,6 +14,11 @@ app = Flask(__name__)
 app.register_blueprint(app_views)
 CORS(app, resources={r"/api/v1/*": {"origins": "*"}})
 
+# Paths that do not require authentication, built once at import
+EXCLUDED_PATHS = frozenset(('/api/v1/status/',
+                            '/api/v1/unauthorized/',
+                            '/api/v1/forbidden/'))
+
 # Initialize auth to None
 auth = None
 
@@ -22,7 +28,6 @@ if auth_type == "basic_auth":
     from api.v1.auth.basic_auth import BasicAuth
     auth = BasicAuth()
 else:
-    from api.v1.auth.auth import Auth
     auth = Auth()
 
 
@@ -32,13 +37,8 @@ def before_request():
     if auth is None:
         return  # If auth is None, do nothing
 
-    # List of paths that do not require authentication
-    excluded_paths = ['/api/v1/status/',
-                      '/api/v1/unauthorized/',
-                      '/api/v1/forbidden/']
-
     # Check if authentication is required for the current request path
-    if not auth.require_auth(request.path, excluded_paths):
+    if not auth.require_auth(request.path, EXCLUDED_PATHS):
         return  # If the path does not require auth, do nothing
 
     # Check for authorization header
@@ -2,6 +2,7 @@
 """ DocDocDocDocDocDoc
 """
 from flask import Blueprint
+from models.user import index_users
 
 app_views = Blueprint("app_views", __name__, url_prefix="/api/v1")
 
@@ -9,3 +10,4 @@ from api.v1.views.index import *
 from api.v1.views.users import *
 
 User.load_from_file()
+index_users()
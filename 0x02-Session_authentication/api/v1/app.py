@@ -6,6 +6,7 @@ from os import getenv
 from flask import Flask, jsonify, abort, request
 from flask_cors import CORS
 from api.v1.views import app_views
+from api.v1.auth.auth_instance import auth  # Authentication in use
 
 def create_app():
     """Create and configure the Flask application."""
@@ -15,32 +16,15 @@ def create_app():
 
     return app
 
-def load_auth():
-    """Load the appropriate authentication class based on environment variable.
-    """
-    auth_type = getenv("AUTH_TYPE")
-    auth = None  # Initialize auth without global scope
-    
-    if auth_type == "basic_auth":
-        from api.v1.auth.basic_auth import BasicAuth
-        auth = BasicAuth()
-    elif auth_type == "session_auth":
-        from api.v1.auth.session_auth import SessionAuth
-        auth = SessionAuth()
-    elif auth_type == "session_exp_auth":
-        from api.v1.auth.session_exp_auth import SessionExpAuth
-        auth = SessionExpAuth()
-    elif auth_type == "session_db_auth":
-        from api.v1.auth.session_db_auth import SessionDBAuth
-        auth = SessionDBAuth()
-    else:
-        from api.v1.auth.auth import Auth
-        auth = Auth()
-
-    return auth
+# Paths that do not require authentication, built once at import
+EXCLUDED_PATHS = (
+    '/api/v1/status/',
+    '/api/v1/unauthorized/',
+    '/api/v1/forbidden/',
+    '/api/v1/auth_session/login/'
+)
 
 app = create_app()  # Create the Flask app
-auth = load_auth()  # Load the appropriate authentication
 
 @app.before_request
 def before_request():
@@ -48,18 +32,11 @@ def before_request():
     if auth is None:
         return
 
-    excluded_paths = [
-        '/api/v1/status/',
-        '/api/v1/unauthorized/',
-        '/api/v1/forbidden/',
-        '/api/v1/auth_session/login/'
-    ]
-
-    if not auth.require_auth(request.path, excluded_paths):
+    if not auth.require_auth(request.path, EXCLUDED_PATHS):
         return
 
-    if (auth.authorization_header(request) is None and
-            auth.session_cookie(request) is None):
+    authorization_header, session_cookie = auth.credentials(request)
+    if authorization_header is None and session_cookie is None:
         abort(401)
 
     request.current_user = auth.current_user(request)
@@ -5,18 +5,92 @@ Module for managing API authentication.
 This module provides a class Auth to handle authentication-related tasks.
 """
 
+import functools
+import sys
 from flask import request
-from typing import List, TypeVar
+from typing import FrozenSet, Iterable, List, Tuple, TypeVar
 import os  # Import os module for accessing environment variables
 
 User = TypeVar('User')
 
+# Name of the session cookie, read once since it can't change at runtime
+SESSION_NAME = os.getenv("SESSION_NAME")
+
+
+@functools.lru_cache(maxsize=8)
+def _split_excluded_paths(excluded_paths: Iterable[str])\
+        -> Tuple[FrozenSet[str], FrozenSet[int], Tuple[str, ...]]:
+    """
+    Normalize excluded paths into exact paths and wildcard prefixes.
+
+    The result is cached, so a given set of excluded paths is only
+    normalized once per process instead of on every request.
+
+    Args:
+        excluded_paths (Iterable[str]): The excluded paths as a tuple or
+        frozenset, where a path ending with * excludes every path
+        starting with it.
+
+    Returns:
+        tuple: The set of normalized (interned) exact paths, the set of
+        their lengths and the tuple of normalized wildcard prefixes.
+    """
+    exact_paths = set()
+    wildcard_prefixes = []
+    for excluded_path in excluded_paths:
+        # Handle wildcard paths that end with *
+        if excluded_path.endswith('*'):
+            wildcard_prefixes.append(excluded_path[:-1].rstrip('/') + '/')
+        else:
+            exact_paths.add(sys.intern(excluded_path.rstrip('/') + '/'))
+    exact_lengths = frozenset(len(exact_path) for exact_path in exact_paths)
+    return frozenset(exact_paths), exact_lengths, tuple(wildcard_prefixes)
+
+
+@functools.lru_cache(maxsize=1024)
+def _path_requires_auth(path: str, excluded_paths: Iterable[str]) -> bool:
+    """
+    Check if a path is outside the excluded paths.
+
+    The answer only depends on the arguments, so it is cached: clients
+    requesting the same routes get it from a single dict lookup.
+
+    Args:
+        path (str): The path to check.
+        excluded_paths (Iterable[str]): The excluded paths as a tuple or
+        frozenset.
+
+    Returns:
+        bool: True if authentication is required, False otherwise.
+    """
+    exact_paths, exact_lengths, wildcard_prefixes =\
+        _split_excluded_paths(excluded_paths)
+
+    # Normalize the path for trailing slashes, without allocating a new
+    # string for the common case of a path ending with a single slash
+    if not path.endswith('/'):
+        path += '/'
+    elif path.endswith('//'):
+        path = path.rstrip('/') + '/'
+
+    # Exact paths are a set lookup (skipped, with the hashing, when
+    # no excluded path has the same length), wildcard prefixes a
+    # single str.startswith call over the tuple
+    if len(path) in exact_lengths and path in exact_paths:
+        return False
+    return not path.startswith(wildcard_prefixes)
+
 
 class Auth:
     """
     Class to manage the API authentication.
     """
 
+    # No per-instance __dict__: instances hold no attributes. Subclasses
+    # declare an empty __slots__ too and keep any state they need at
+    # class or module level, shared by all their instances
+    __slots__ = ()
+
     def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
         """
         Check if authentication is required for the given path.
@@ -31,23 +105,10 @@ class Auth:
         if path is None or excluded_paths is None or len(excluded_paths) == 0:
             return True
 
-        # Normalize the path for trailing slashes
-        path = path.rstrip('/') + '/'
-
-        for excluded_path in excluded_paths:
-            # Handle wildcard paths that end with *
-            if excluded_path.endswith('*'):
-                # Remove the '*' and normalize the excluded path
-                normalized_excluded_path = excluded_path[:-1].rstrip('/') + '/'
-                if path.startswith(normalized_excluded_path):
-                    return False
-            else:
-                # Normalize the excluded path
-                normalized_excluded_path = excluded_path.rstrip('/') + '/'
-                if path == normalized_excluded_path:
-                    return False
-
-        return True
+        # The caches need a hashable key
+        if not isinstance(excluded_paths, (tuple, frozenset)):
+            excluded_paths = tuple(excluded_paths)
+        return _path_requires_auth(path, excluded_paths)
 
     def authorization_header(self, request: request = None) -> str:
         """
@@ -91,7 +152,22 @@ class Auth:
         if request is None:
             return None  # Return None if request is None
 
-        # Get cookie name from the environment variable
-        session_name = os.getenv("SESSION_NAME")
-        # Return the value of the cookie named _my_session_id
-        return request.cookies.get(session_name)
+        # Return the value of the cookie named after SESSION_NAME
+        return request.cookies.get(SESSION_NAME)
+
+    def credentials(self, request=None) -> Tuple[str, str]:
+        """
+        Retrieve the authorization header and the session cookie at once.
+
+        Args:
+            request (flask.Request, optional): The request object.
+            Defaults to None.
+
+        Returns:
+            tuple: The authorization header and the session cookie value,
+            each None if not found.
+        """
+        if request is None:
+            return None, None
+        return (request.headers.get('Authorization'),
+                request.cookies.get(SESSION_NAME))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Module holding the authentication instance of the API.
+
+Both api.v1.app and the views import auth from here, rather than the
+views importing it from api.v1.app, which imports the views.
+"""
+import importlib
+from os import getenv
+from api.v1.auth.auth import Auth
+
+# AUTH_TYPE value -> (module, class) of the authentication to use
+AUTH_REGISTRY = {
+    "basic_auth": ("api.v1.auth.basic_auth", "BasicAuth"),
+    "session_auth": ("api.v1.auth.session_auth", "SessionAuth"),
+    "session_exp_auth": ("api.v1.auth.session_exp_auth", "SessionExpAuth"),
+    "session_db_auth": ("api.v1.auth.session_db_auth", "SessionDBAuth"),
+    "session_redis_auth": ("api.v1.auth.session_redis_auth",
+                           "SessionRedisAuth"),
+}
+
+
+def load_auth():
+    """Load the appropriate authentication class based on environment variable.
+
+    Only the module of the selected class is imported; the base Auth,
+    which every one of them inherits from, is used when AUTH_TYPE is unset.
+
+    Raises:
+        ValueError: If AUTH_TYPE is set to an unknown value, rather than
+            falling back to Auth and rejecting every request.
+    """
+    auth_type = getenv("AUTH_TYPE")
+    if not auth_type:
+        return Auth()
+    entry = AUTH_REGISTRY.get(auth_type)
+    if entry is None:
+        raise ValueError("Unknown AUTH_TYPE {!r}, expected one of: {}".format(
+            auth_type, ", ".join(AUTH_REGISTRY)))
+    module_name, class_name = entry
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+auth = load_auth()  # Load the appropriate authentication
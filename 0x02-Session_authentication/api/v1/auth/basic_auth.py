@@ -6,13 +6,18 @@ This module provides the BasicAuth class, which extends
 the Auth class to handle basic authentication methods.
 """
 
-import base64
+import binascii
+import re
+from flask import g
 from api.v1.auth.auth import Auth
-from models.user import User
+from models.user import User, find_by_email
 from typing import TypeVar, Tuple
 
 UserType = TypeVar('User')
 
+# Padded Base64, checked before decoding so bad input never raises
+BASE64_RE = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+
 
 class BasicAuth(Auth):
     """
@@ -22,6 +27,8 @@ class BasicAuth(Auth):
     future implementation.
     """
 
+    __slots__ = ()
+
     def extract_base64_authorization_header(self,
                                             authorization_header: str) -> str:
         """
@@ -40,9 +47,10 @@ class BasicAuth(Auth):
             return None
         if not isinstance(authorization_header, str):
             return None
-        if not authorization_header.startswith("Basic "):
+        # One prefix compare and one slice, no intermediate list
+        if authorization_header[:6] != "Basic ":
             return None
-        return authorization_header.split(" ", 1)[1]
+        return authorization_header[6:]
 
     def decode_base64_authorization_header(self,
                                            base64_authorization_header: str)\
@@ -60,11 +68,16 @@ class BasicAuth(Auth):
             return None
         if not isinstance(base64_authorization_header, str):
             return None
+        if len(base64_authorization_header) % 4 != 0 or\
+                BASE64_RE.fullmatch(base64_authorization_header) is None:
+            return None
         try:
             # Decode the Base64 string
-            decoded_bytes = base64.b64decode(base64_authorization_header)
+            decoded_bytes = binascii.a2b_base64(
+                base64_authorization_header.encode('ascii'))
             return decoded_bytes.decode('utf-8')
-        except (ValueError, TypeError):
+        except ValueError:
+            # binascii.Error or UnicodeDecodeError
             return None
 
     def extract_user_credentials(self,
@@ -86,15 +99,14 @@ class BasicAuth(Auth):
         if not isinstance(decoded_base64_authorization_header, str):
             return None, None
 
-        # Split the decoded string into email and password on the first colon
-        if ":" not in decoded_base64_authorization_header:
+        # Split the decoded string into email and password on the first
+        # colon, with a single scan and no intermediate list
+        colon = decoded_base64_authorization_header.find(":")
+        if colon < 0:
             return None, None
 
-        # This will split on the first occurrence of colon
-        user_email, user_pwd =\
-            decoded_base64_authorization_header.split(":", 1)
-
-        return user_email, user_pwd
+        return (decoded_base64_authorization_header[:colon],
+                decoded_base64_authorization_header[colon + 1:])
 
     def user_object_from_credentials(self, user_email: str, user_pwd: str)\
             -> TypeVar('User'):
@@ -110,19 +122,22 @@ class BasicAuth(Auth):
         """
         if type(user_email) is str and type(user_pwd) is str:
             try:
-                users = User.search({'email': user_email})
+                user = find_by_email(user_email)
             except Exception:
+                # Unreadable users, e.g. a corrupt .db_User.json: the
+                # request is unauthenticated rather than a server error
                 return None
-            if len(users) <= 0:
-                return None
-            if users[0].is_valid_password(user_pwd):
-                return users[0]
+            if user is not None and user.is_valid_password(user_pwd):
+                return user
         return None
 
     def current_user(self, request=None) -> TypeVar('User'):
         """
         Retrieve the current User instance from a request.
 
+        The user is resolved once per request and kept on flask.g, so
+        further calls skip decoding the header and searching the users.
+
         Args:
             request: The HTTP request object.
 
@@ -132,6 +147,9 @@ class BasicAuth(Auth):
         if request is None:
             return None
 
+        if 'basic_auth_user' in g:
+            return g.basic_auth_user
+
         # Get the authorization header
         auth_header = self.authorization_header(request)
 
@@ -148,4 +166,6 @@ class BasicAuth(Auth):
             self.extract_user_credentials(decoded_auth_header)
 
         # Retrieve the User object based on email and password
-        return self.user_object_from_credentials(user_email, user_pwd)
+        g.basic_auth_user =\
+            self.user_object_from_credentials(user_email, user_pwd)
+        return g.basic_auth_user
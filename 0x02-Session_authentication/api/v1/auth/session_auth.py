@@ -8,11 +8,18 @@ authentication tasks, inheriting from the Auth class.
 
 from api.v1.auth.auth import Auth  # Import the Auth class
 from flask import request
-from typing import TypeVar
-import uuid  # Import the uuid module to generate session IDs
+import os  # To access environment variables
+import secrets  # Generate cookie-safe session IDs
 from models.user import User  # Import the User model
 
-UserType = TypeVar('User')
+# Maximum number of sessions kept in memory, the least recently used
+# session is dropped beyond it
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS") or 100000)
+
+# User IDs by session ID, in LRU order (dicts keep insertion order).
+# Shared by every SessionAuth and subclass instance of this process; not
+# shared between worker processes, use SessionRedisAuth for that.
+_SESSIONS = {}
 
 
 class SessionAuth(Auth):
@@ -22,31 +29,61 @@ class SessionAuth(Auth):
     management functionality.
     """
 
-    # Class attribute to store user IDs by session ID
-    user_id_by_session_id = {}
+    __slots__ = ()
 
-    def __init__(self):
-        """ Initialize the SessionAuth class """
-        super().__init__()  # Call the constructor of the parent class Auth
+    # The sessions, kept as a class attribute for existing callers; the
+    # methods use the _SESSIONS global directly
+    user_id_by_session_id = _SESSIONS
 
-    def create_session(self, user_id: str = None) -> str:
+    def _remove_session(self, session_id: str) -> None:
         """
-        Create a Session ID for a given user_id.
+        Forget a session, whether it is destroyed or evicted.
+
+        Args:
+            session_id (str): The Session ID to forget.
+        """
+        _SESSIONS.pop(session_id, None)
+
+    @staticmethod
+    def _new_session_id(user_id: str) -> str:
+        """
+        Generate a Session ID for a user_id, without storing it.
+
+        Subclasses with their own session store call this directly rather
+        than going through the create_session chain.
 
         Args:
             user_id (str): The user ID for which to create the session.
 
         Returns:
-            str: The Session ID if successful, None otherwise.
+            str: The Session ID if user_id is valid, None otherwise.
         """
         if user_id is None:
             return None  # Return None if user_id is None
         if not isinstance(user_id, str):
             return None  # Return None if user_id is not a string
 
-        # Generate a new Session ID
-        session_id = str(uuid.uuid4())  # Generate a UUID for the session ID
-        self.user_id_by_session_id[session_id] = user_id  # Store in dictionary
+        # 128 random bits, URL-safe so the cookie needs no quoting
+        return secrets.token_urlsafe(16)
+
+    def create_session(self, user_id: str = None) -> str:
+        """
+        Create a Session ID for a given user_id.
+
+        Args:
+            user_id (str): The user ID for which to create the session.
+
+        Returns:
+            str: The Session ID if successful, None otherwise.
+        """
+        session_id = self._new_session_id(user_id)  # Generate a Session ID
+        if session_id is None:
+            return None
+
+        _SESSIONS[session_id] = user_id  # Store in dictionary
+        if len(_SESSIONS) > MAX_SESSIONS:
+            # Evict the least recently used session
+            self._remove_session(next(iter(_SESSIONS)))
 
         return session_id  # Return the Session ID
 
@@ -66,12 +103,20 @@ class SessionAuth(Auth):
             return None  # Return None if session_id is not a string
 
         # Use .get() to retrieve the User ID from the dictionary
-        return self.user_id_by_session_id.get(session_id)  # Return the User ID
-
-    def current_user(self, request=None) -> UserType:
+        user_id = _SESSIONS.get(session_id)
+        if user_id is not None:
+            try:
+                # Mark the session as recently used: move it to the end
+                _SESSIONS[session_id] = _SESSIONS.pop(session_id)
+            except KeyError:
+                pass  # Destroyed by another request in the meantime
+        return user_id  # Return the User ID
+
+    def current_user(self, request=None) -> User:
         """
         Overloaded method to retrieve the current User instance based on
-        session cookie.
+        session cookie. The user is remembered on the request, so later
+        calls during the same request skip the lookups.
 
         Args:
             request (flask.Request, optional): The request object.
@@ -84,6 +129,11 @@ class SessionAuth(Auth):
         if request is None:
             return None  # Return None if request is None
 
+        # Reuse the user already resolved for this request, if any
+        user = getattr(request, '_session_user', None)
+        if user is not None:
+            return user
+
         # Get the session cookie value
         session_id = self.session_cookie(request)
 
@@ -95,6 +145,7 @@ class SessionAuth(Auth):
 
         # Retrieve the User instance from the database using the User ID
         user = User.get(user_id)
+        request._session_user = user
 
         return user  # Return the User instance
 
@@ -123,6 +174,6 @@ class SessionAuth(Auth):
             return False  # Session ID not found
 
         # Remove the Session ID from the user_id_by_session_id dictionary
-        del self.user_id_by_session_id[session_id]
+        self._remove_session(session_id)
 
         return True  # Indicate that the session was successfully destroyed
@@ -6,10 +6,16 @@ This module provides a class SessionDBAuth that inherits from
 SessionExpAuth and handles session management using a database.
 """
 
+import threading
+import time
+from datetime import datetime, timedelta
 from api.v1.auth.session_exp_auth import SessionExpAuth
 from models.user_session import UserSession
 from models.user import User
 
+# Sessions saved by a previous run of the app
+UserSession.load_from_file()
+
 
 class SessionDBAuth(SessionExpAuth):
     """
@@ -18,10 +24,42 @@ class SessionDBAuth(SessionExpAuth):
     session management.
     """
 
+    __slots__ = ()
+
+    # Process-local cache in front of the database:
+    # session_id -> (user_id, expiration time on the time.monotonic() clock)
+    _session_cache = {}
+    # Only writes are locked, reading a dict is atomic
+    _session_cache_lock = threading.Lock()
+
+    def _cache_session(self, session_id: str, user_id: str,
+                       ttl: float) -> None:
+        """ Cache the user ID of a session for ttl seconds. """
+        with self._session_cache_lock:
+            self._session_cache[session_id] = (user_id,
+                                               time.monotonic() + ttl)
+        if self.session_duration > 0 and not self._sweeper_started:
+            self._start_sweeper()  # Expired entries must leave the cache
+
+    def _evict_expired(self) -> None:
+        """ Also drop the expired entries of the session cache. """
+        super()._evict_expired()
+        now = time.monotonic()
+        expired = [session_id for session_id, (_, expires_at)
+                   in list(self._session_cache.items()) if expires_at <= now]
+        with self._session_cache_lock:
+            for session_id in expired:
+                self._session_cache.pop(session_id, None)
+
+    def _user_session(self, session_id: str) -> UserSession:
+        """ Retrieve the UserSession of a session ID from the database. """
+        return UserSession.get_by_session_id(session_id)
+
     def create_session(self, user_id=None) -> str:
         """ Create and store a new instance of UserSession. """
-        # Call parent to create session ID
-        session_id = super().create_session(user_id)
+        # The database is the store, only a Session ID is needed from the
+        # parents: skip their in-memory bookkeeping
+        session_id = self._new_session_id(user_id)
 
         if session_id is None:
             return None  # Return None if a Session ID can't be created
@@ -30,19 +68,40 @@ class SessionDBAuth(SessionExpAuth):
         user_session = UserSession(user_id=user_id, session_id=session_id)
         user_session.save()  # Save the UserSession to the database
 
+        self._cache_session(session_id, user_id,
+                            self.session_duration
+                            if self.session_duration > 0 else float('inf'))
+
         return session_id  # Return the Session ID created
 
     def user_id_for_session_id(self, session_id=None) -> str:
-        """ Retrieve User ID based on session ID from the database. """
+        """ Retrieve User ID based on session ID from the database.
+
+        Sessions seen by this process are answered from memory until they
+        expire; only unknown ones hit the database.
+        """
         if session_id is None:
             return None  # Return None if session_id is None
 
+        entry = self._session_cache.get(session_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
         # Retrieve UserSession instance based on session_id
-        user_session = UserSession.get(session_id)
+        user_session = self._user_session(session_id)
 
         if user_session is None:
             return None  # Return None if UserSession not found
 
+        ttl = float('inf')
+        if self.session_duration > 0:
+            expiration_time = user_session.created_at +\
+                timedelta(seconds=self.session_duration)
+            ttl = (expiration_time - datetime.utcnow()).total_seconds()
+            if ttl <= 0:
+                return None  # Session has expired
+
+        self._cache_session(session_id, user_session.user_id, ttl)
         return user_session.user_id  # Return the user_id from UserSession
 
     def destroy_session(self, request=None) -> bool:
@@ -55,8 +114,11 @@ class SessionDBAuth(SessionExpAuth):
         if session_id is None:  # If no session ID, return False
             return False
 
+        with self._session_cache_lock:
+            self._session_cache.pop(session_id, None)
+
         # Retrieve UserSession instance to verify if it exists
-        user_session = UserSession.get(session_id)
+        user_session = self._user_session(session_id)
 
         if user_session is None:
             return False  # If UserSession not found, return False
@@ -7,8 +7,27 @@ SessionAuth and handles session management with expiration timing.
 """
 
 from api.v1.auth.session_auth import SessionAuth  # Import SessionAuth class
-from datetime import datetime, timedelta  # Import datetime and timedelta
 import os  # To access environment variables
+import threading
+import time  # Monotonic clock for session creation times
+
+# Seconds between two sweeps of expired sessions
+SWEEP_INTERVAL = 60
+
+# Nanoseconds per second, creation times are time.monotonic_ns() integers
+NS_PER_SECOND = 1000000000
+
+
+def _session_duration() -> int:
+    """ Parse SESSION_DURATION, defaulting to 0 if missing or invalid. """
+    try:
+        return int(os.getenv("SESSION_DURATION") or 0)
+    except ValueError:
+        return 0  # Assign 0 if parsing fails
+
+
+# Session lifetime in seconds, parsed once at import
+_SESSION_DURATION = _session_duration()
 
 
 class SessionExpAuth(SessionAuth):
@@ -18,17 +37,51 @@ class SessionExpAuth(SessionAuth):
     functionality.
     """
 
-    def __init__(self):
-        """ Initialize the SessionExpAuth class """
-        super().__init__()  # Call the constructor of parent class SessionAuth
-
-        # Get SESSION_DURATION and cast to an integer, default to 0 if invalid
-        session_duration = os.getenv("SESSION_DURATION")
-        try:
-            self.session_duration =\
-                int(session_duration) if session_duration else 0
-        except ValueError:
-            self.session_duration = 0  # Assign 0 if parsing fails
+    __slots__ = ()
+
+    # SESSION_DURATION is parsed once, when the module is imported
+    session_duration = _SESSION_DURATION
+
+    # Creation time of each session in time.monotonic_ns() nanoseconds,
+    # kept next to user_id_by_session_id rather than in a dict per session
+    _created_at = {}
+
+    # One sweeper thread per process, whatever the number of instances
+    _sweeper_started = False
+    _sweeper_lock = threading.Lock()
+
+    def _start_sweeper(self) -> None:
+        """ Start the expired-session sweeper unless it already runs. """
+        with SessionExpAuth._sweeper_lock:
+            if SessionExpAuth._sweeper_started:
+                return
+            SessionExpAuth._sweeper_started = True
+        threading.Thread(target=self._sweep, daemon=True).start()
+
+    def _sweep(self) -> None:
+        """ Evict expired sessions every SWEEP_INTERVAL seconds.
+
+        Expired sessions are otherwise only detected when used, so
+        abandoned ones would stay in memory forever.
+        """
+        while True:
+            time.sleep(SWEEP_INTERVAL)
+            self._evict_expired()
+
+    def _evict_expired(self) -> None:
+        """ Forget every session older than session_duration. """
+        oldest = time.monotonic_ns() - self.session_duration * NS_PER_SECOND
+        # Snapshot, requests may add sessions while we iterate
+        expired = [session_id for session_id, created_at
+                   in list(self._created_at.items())
+                   if created_at < oldest]
+        for session_id in expired:
+            self._remove_session(session_id)
+
+    def _remove_session(self, session_id: str) -> None:
+        """ Forget a session and its creation time. """
+        super()._remove_session(session_id)
+        self._created_at.pop(session_id, None)
 
     def create_session(self, user_id=None):
         """ Create a Session ID for a user ID with session expiration. """
@@ -37,11 +90,11 @@ class SessionExpAuth(SessionAuth):
         if session_id is None:
             return None  # Return None if a Session ID can't be created
 
-        # Create a session dictionary to store additional session info
-        self.user_id_by_session_id[session_id] = {
-            "user_id": user_id,
-            "created_at": datetime.now()  # Store the current datetime
-        }
+        # The parent stored the user ID, only the creation time is added
+        self._created_at[session_id] = time.monotonic_ns()
+
+        if self.session_duration > 0 and not self._sweeper_started:
+            self._start_sweeper()  # Sessions can expire from now on
 
         return session_id  # Return the Session ID created
 
@@ -51,21 +104,21 @@ class SessionExpAuth(SessionAuth):
             return None
 
         # Check if the session_id exists in the dictionary
-        session_data = self.user_id_by_session_id.get(session_id)
-        if session_data is None:
+        user_id = super().user_id_for_session_id(session_id)
+        if user_id is None:
             return None  # Return None if session ID not found
 
         # Check expiration logic
         if self.session_duration <= 0:
-            return session_data["user_id"]
+            return user_id
 
-        created_at = session_data.get("created_at")
+        created_at = self._created_at.get(session_id)
         if created_at is None:
             return None  # Return None if no creation time was found
 
-        # Calculate expiration time
-        expiration_time = created_at + timedelta(seconds=self.session_duration)
-        if datetime.now() > expiration_time:
+        # Integer arithmetic only, no datetime nor float rounding
+        if time.monotonic_ns() - created_at > \
+                self.session_duration * NS_PER_SECOND:
             return None  # Session has expired
 
-        return session_data["user_id"]  # Return the user ID if still valid
+        return user_id  # Return the user ID if still valid
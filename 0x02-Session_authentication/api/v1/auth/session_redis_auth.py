@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Module for managing Redis session authentication.
+
+This module provides a class SessionRedisAuth that inherits from
+SessionExpAuth and keeps sessions in Redis, so that every worker
+process shares them and they survive restarts.
+"""
+
+import os  # To access environment variables
+import redis
+from api.v1.auth.session_exp_auth import SessionExpAuth
+
+# Client (and its connection pool) shared by every SessionRedisAuth
+REDIS = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"),
+                             decode_responses=True)
+
+# Prefix of the Redis keys holding sessions
+KEY_PREFIX = "session:"
+
+
+class SessionRedisAuth(SessionExpAuth):
+    """
+    Class to manage API authentication using sessions stored in Redis.
+    Session expiration is delegated to Redis through the key TTL.
+    """
+
+    __slots__ = ()
+
+    def create_session(self, user_id=None) -> str:
+        """ Create a Session ID and store it in Redis. """
+        # Redis is the store, only a Session ID is needed from the parents:
+        # skip their in-memory bookkeeping
+        session_id = self._new_session_id(user_id)
+
+        if session_id is None:
+            return None  # Return None if a Session ID can't be created
+
+        # Let Redis drop the session once SESSION_DURATION is over
+        REDIS.set(KEY_PREFIX + session_id, user_id,
+                  ex=self.session_duration if self.session_duration > 0
+                  else None)
+
+        return session_id  # Return the Session ID created
+
+    def user_id_for_session_id(self, session_id=None) -> str:
+        """ Retrieve User ID based on session ID from Redis. """
+        if session_id is None:
+            return None  # Return None if session_id is None
+
+        # Expired sessions are already gone from Redis
+        return REDIS.get(KEY_PREFIX + session_id)
+
+    def destroy_session(self, request=None) -> bool:
+        """ Remove the session of the Session ID from the request. """
+        if request is None:
+            return False  # Return False if request is None
+
+        session_id = self.session_cookie(request)
+        if session_id is None:  # If no session ID, return False
+            return False
+
+        # DELETE returns the number of keys removed
+        return REDIS.delete(KEY_PREFIX + session_id) > 0
@@ -2,6 +2,7 @@
 """ DocDocDocDocDocDoc
 """
 from flask import Blueprint
+from models.user import index_users
 
 app_views = Blueprint("app_views", __name__, url_prefix="/api/v1")
 
@@ -12,4 +13,5 @@ from api.v1.views.session_auth import *
 
 # Load User data after all routes are imported
 User.load_from_file()
+index_users()
 
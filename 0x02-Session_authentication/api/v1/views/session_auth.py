@@ -3,11 +3,39 @@
 Module for handling session authentication routes.
 """
 
+import json
 from flask import jsonify, request, abort
-from models.user import User  # Import the User model
-import os  # To access environment variables
+from models.user import find_by_email  # Indexed User lookup
+from api.v1.auth.auth import SESSION_NAME  # Cookie name, read at import
 from api.v1.views import app_views  # Import the blueprint
-from api.v1.app import auth  # Import the auth for session management
+from api.v1.auth.auth_instance import auth  # Session management
+
+
+def _constant_response(payload: dict, status: int) -> tuple:
+    """
+    Serialize a response that never changes once, at import.
+
+    The body is encoded as jsonify does: compact separators, sorted keys,
+    ASCII-only output and a trailing newline.
+
+    Returns:
+        A (body, status, headers) tuple Flask can return as is.
+    """
+    body = json.dumps(payload, ensure_ascii=True, sort_keys=True,
+                      separators=(",", ":")) + "\n"
+    return body.encode(), status, {"Content-Type": "application/json"}
+
+
+# Error responses of login, built once rather than on every request
+_ERR_EMAIL = _constant_response({"error": "email missing"}, 400)
+_ERR_PASSWORD = _constant_response({"error": "password missing"}, 400)
+_ERR_NO_USER = _constant_response({"error": "no user found for this email"},
+                                  404)
+_ERR_WRONG_PASSWORD = _constant_response({"error": "wrong password"}, 401)
+
+# Set-Cookie header of a session, formatted once instead of by set_cookie.
+# Session IDs come from secrets.token_urlsafe, they never need quoting.
+_COOKIE_TEMPLATE = "{}=%s; Path=/; HttpOnly; SameSite=Lax".format(SESSION_NAME)
 
 
 @app_views.route('/auth_session/login', methods=['POST'], strict_slashes=False)
@@ -25,33 +53,30 @@ def login():
     password = request.form.get('password')  # Retrieve the password
 
     if not email:  # Check if email is missing or empty
-        return jsonify({"error": "email missing"}), 400
+        return _ERR_EMAIL
 
     if not password:  # Check if password is missing or empty
-        return jsonify({"error": "password missing"}), 400
+        return _ERR_PASSWORD
 
-    # Search for the User instance based on the email
-    user_list = User.search({"email": email})
+    # Look the User instance up by email
+    user = find_by_email(email)
 
     # Check if a user was found
-    if not user_list:
-        return jsonify({"error": "no user found for this email"}), 404
-
-    user = user_list[0]  # Get the first user from the list (if any)
+    if user is None:
+        return _ERR_NO_USER
 
     # Check if the password is valid
     if not user.is_valid_password(password):
-        return jsonify({"error": "wrong password"}), 401  # Wrong password
+        return _ERR_WRONG_PASSWORD  # Wrong password
 
     # Create the session ID for the user
     session_id = auth.create_session(user.id)  # Assuming user.id is the ID
 
     # Prepare the response with user details
     response = jsonify(user.to_json())  # Get user JSON representation
-    session_name = os.getenv("SESSION_NAME")  # Get the cookie name
 
     # Set the session ID as a cookie in the response
-    response.set_cookie(session_name, session_id)  # Set the cookie
+    response.headers.add("Set-Cookie", _COOKIE_TEMPLATE % session_id)
 
     return response  # Return response with user details and cookie
 
@@ -3,7 +3,7 @@
 """
 from api.v1.views import app_views
 from flask import abort, jsonify, request
-from models.user import User
+from models.user import EMAIL_INDEX, User
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
@@ -61,6 +61,9 @@ def delete_user(user_id: str = None) -> str:
     if user is None:
         abort(404)
     user.remove()
+    if EMAIL_INDEX.get(user.email) is user:
+        # Another user may share the email, let find_by_email search again
+        del EMAIL_INDEX[user.email]
     return jsonify({}), 200
 
 
@@ -96,6 +99,7 @@ def create_user() -> str:
             user.first_name = rj.get("first_name")
             user.last_name = rj.get("last_name")
             user.save()
+            EMAIL_INDEX.setdefault(user.email, user)
             return jsonify(user.to_json()), 201
         except Exception as e:
             error_msg = "Can't create User: {}".format(e)
@@ -18,6 +18,28 @@ class User(Base):
         self.first_name = kwargs.get('first_name')
         self.last_name = kwargs.get('last_name')
 
+    def __setattr__(self, name: str, value):
+        """ Set an attribute, dropping the cached JSON if it shows in it
+        """
+        if name[0] != '_':
+            self.__dict__.pop('_json_cache', None)
+        super().__setattr__(name, value)
+
+    def to_json(self, for_serialization: bool = False) -> dict:
+        """ Convert the object a JSON dictionary
+
+        The public form is cached until a public attribute changes; a copy
+        is returned so callers can't alter the cache.
+        """
+        if for_serialization:
+            result = super().to_json(True)
+            result.pop('_json_cache', None)
+            return result
+        cache = self.__dict__.get('_json_cache')
+        if cache is None:
+            cache = self._json_cache = super().to_json()
+        return dict(cache)
+
     @property
     def password(self) -> str:
         """ Getter of the password
@@ -57,3 +79,38 @@ class User(Base):
             return "{}".format(self.last_name)
         else:
             return "{} {}".format(self.first_name, self.last_name)
+
+
+# email -> User, built by index_users() once the users are loaded and kept
+# up to date by the views creating and deleting users
+EMAIL_INDEX = {}
+
+
+def index_users():
+    """ Rebuild EMAIL_INDEX from all the loaded users
+    """
+    EMAIL_INDEX.clear()
+    for user in User.all():
+        # Keep the first user of an email, like User.search(...)[0]
+        EMAIL_INDEX.setdefault(user.email, user)
+
+
+def find_by_email(email: str) -> User:
+    """ Return the User of an email, or None
+
+    EMAIL_INDEX answers in O(1); a miss falls back to User.search so that
+    users the index doesn't know about are still found. Errors of
+    User.search other than users not being loaded are raised, as by
+    User.search itself.
+    """
+    user = EMAIL_INDEX.get(email)
+    if user is not None:
+        return user
+    try:
+        users = User.search({'email': email})
+    except KeyError:
+        return None  # Users not loaded yet
+    if len(users) <= 0:
+        return None
+    EMAIL_INDEX[email] = users[0]
+    return users[0]
@@ -1,9 +1,46 @@
 #!/usr/bin/env python3
 """
 Module for managing user sessions.
+
+Sessions live in memory: saving or removing one no longer rewrites
+.db_UserSession.json, a background thread writes it every FLUSH_INTERVAL
+seconds (and once more at exit) instead.
 """
 
-from models.base import Base
+import atexit
+import json
+import threading
+import time
+from datetime import datetime
+from models.base import Base, DATA
+
+# Seconds between two writes of the sessions to disk
+FLUSH_INTERVAL = 30
+
+# session_id -> UserSession, so sessions are found without a search
+_STORE = {}
+
+# One flusher thread per process, started by the first save
+_flusher_started = False
+_flusher_lock = threading.Lock()
+
+
+def _flush_periodically():
+    """ Write the sessions to disk every FLUSH_INTERVAL seconds """
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        UserSession.save_to_file()
+
+
+def _start_flusher():
+    """ Start the flusher thread unless it already runs """
+    global _flusher_started
+    with _flusher_lock:
+        if _flusher_started:
+            return
+        _flusher_started = True
+    atexit.register(UserSession.save_to_file)
+    threading.Thread(target=_flush_periodically, daemon=True).start()
 
 
 class UserSession(Base):
@@ -21,3 +58,41 @@ class UserSession(Base):
 
         # Initialize session_id from keyword arguments
         self.session_id = kwargs.get('session_id')
+
+    @classmethod
+    def load_from_file(cls):
+        """ Load all sessions from file and index them by session ID """
+        super().load_from_file()
+        _STORE.clear()
+        for user_session in DATA[cls.__name__].values():
+            _STORE[user_session.session_id] = user_session
+
+    @classmethod
+    def save_to_file(cls):
+        """ Save all sessions to file
+
+        Works on a copy, requests may add or remove sessions meanwhile.
+        """
+        objs_json = {}
+        for obj_id, obj in list(DATA.get(cls.__name__, {}).items()):
+            objs_json[obj_id] = obj.to_json(True)
+
+        with open(".db_{}.json".format(cls.__name__), 'w') as f:
+            json.dump(objs_json, f)
+
+    @classmethod
+    def get_by_session_id(cls, session_id: str) -> 'UserSession':
+        """ Return the UserSession of a session ID, or None """
+        return _STORE.get(session_id)
+
+    def save(self):
+        """ Save the session in memory, it reaches the disk at next flush """
+        self.updated_at = datetime.utcnow()
+        DATA[self.__class__.__name__][self.id] = self
+        _STORE[self.session_id] = self
+        _start_flusher()
+
+    def remove(self):
+        """ Remove the session from memory """
+        DATA[self.__class__.__name__].pop(self.id, None)
+        _STORE.pop(self.session_id, None)
@@ -5,7 +5,8 @@ Flask application to manage user registration.
 This application sets up an endpoint to register users through a JSON API.
 """
 
-from flask import Flask, jsonify, request, abort, redirect
+import json
+from flask import Flask, Response, g, jsonify, request, abort, redirect
 from auth import Auth
 
 # Initialize a Flask application
@@ -15,6 +16,85 @@ app = Flask(__name__)
 AUTH = Auth()
 
 
+def _dumps(payload: dict) -> bytes:
+    """Encode a JSON body the way jsonify does.
+
+    Same options as Flask's default JSON provider: compact separators,
+    sorted keys, ASCII-only output and a trailing newline.
+
+    Args:
+        payload (dict): The object to encode.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    body = json.dumps(payload, ensure_ascii=True, sort_keys=True,
+                      separators=(",", ":")) + "\n"
+    return body.encode()
+
+
+def _json_response(payload: dict, status: int = 200) -> Response:
+    """Build a JSON response without going through jsonify.
+
+    Args:
+        payload (dict): The JSON body of the response.
+        status (int): The HTTP status of the response.
+
+    Returns:
+        Response: The JSON response.
+    """
+    return Response(_dumps(payload), status=status,
+                    mimetype="application/json")
+
+
+def _constant_response(payload: dict, status: int) -> tuple:
+    """Serialize a response that never changes once, at import.
+
+    Args:
+        payload (dict): The JSON body of the response.
+        status (int): The HTTP status of the response.
+
+    Returns:
+        tuple: A (body, status, headers) tuple Flask can return as is.
+    """
+    return _dumps(payload), status, {"Content-Type": "application/json"}
+
+
+# Error responses, built once rather than by jsonify on every request
+_ERR_CREDENTIALS = _constant_response(
+    {"message": "email and password required"}, 400)
+_ERR_REGISTERED = _constant_response(
+    {"message": "email already registered"}, 400)
+_ERR_EMAIL = _constant_response({"message": "email field is required"}, 400)
+_ERR_NOT_REGISTERED = _constant_response(
+    {"message": "email not registered"}, 403)
+_ERR_RESET_FIELDS = _constant_response(
+    {"message": "email, reset_token, or new_password missing"}, 400)
+_ERR_RESET_TOKEN = _constant_response({"message": "Invalid reset token"}, 403)
+
+# The welcome message never changes either
+_WELCOME = _constant_response({"message": "Bienvenue"}, 200)
+
+
+@app.before_request
+def load_session_user() -> None:
+    """Look the user of the session cookie up once per request.
+
+    The views read it from g.user, None when there is no valid session.
+    """
+    AUTH.start_request()
+
+    session_id = request.cookies.get("session_id")
+    g.user = AUTH.get_user_from_session_id(session_id) \
+        if session_id else None
+
+
+@app.teardown_appcontext
+def remove_db_session(exception) -> None:
+    """Give the database session of the request back to the pool."""
+    AUTH.end_request()
+
+
 @app.route('/', methods=['GET'])
 def welcome() -> jsonify:
     """Return a welcome message in JSON format.
@@ -22,7 +102,7 @@ def welcome() -> jsonify:
     Returns:
         jsonify: A JSON response with a welcome message.
     """
-    return jsonify({"message": "Bienvenue"})
+    return _WELCOME
 
 
 @app.route('/users', methods=['POST'])
@@ -38,14 +118,14 @@ def register_user() -> jsonify:
 
     # Check if both fields are provided
     if not email or not password:
-        return jsonify({"message": "email and password required"}), 400
+        return _ERR_CREDENTIALS
 
     try:
         # Register the user through the AUTH object
         AUTH.register_user(email=email, password=password)
         return jsonify({"email": email, "message": "user created"}), 201
     except ValueError:
-        return jsonify({"message": "email already registered"}), 400
+        return _ERR_REGISTERED
 
 
 @app.route('/sessions', methods=['POST'])
@@ -60,7 +140,7 @@ def login() -> jsonify:
 
     # Verify that both fields are provided
     if not email or not password:
-        return jsonify({"message": "email and password required"}), 400
+        return _ERR_CREDENTIALS
 
     # Validate login credentials
     if not AUTH.valid_login(email=email, password=password):
@@ -83,22 +163,13 @@ def logout() -> str:
     Returns:
         jsonify: A JSON response indicating the result of the logout.
     """
-    # Get session ID from cookies
-    session_id = request.cookies.get("session_id")
-
-    if session_id is None:
-        # Handle the case where session ID is missing
-        abort(403)
-
-    # Find the user associated with the session ID
-    user = AUTH.get_user_from_session_id(session_id)
-
-    if user is None:
-        # User does not exist, respond with 403
+    # User of the session cookie, looked up by load_session_user
+    if g.user is None:
+        # Missing session ID or no such user, respond with 403
         abort(403)
 
     # User exists, destroy the session
-    AUTH.destroy_session(user.id)
+    AUTH.destroy_session(g.user.id)
 
     # Respond with a success message and redirect to GET /
     return redirect("/")
@@ -113,20 +184,12 @@ def profile() -> jsonify:
                   or a 403 status if the session ID is invalid or
                   user does not exist.
     """
-    # Get session ID from cookies
-    session_id = request.cookies.get("session_id")
-
-    if session_id is None:
-        abort(403)  # Handle case where session ID is missing
-
-    # Find the user associated with the session ID
-    user = AUTH.get_user_from_session_id(session_id)
-
-    if user is None:
-        abort(403)  # User does not exist, respond with 403
+    # User of the session cookie, looked up by load_session_user
+    if g.user is None:
+        abort(403)  # Missing session ID or no such user, respond with 403
 
     # Respond with the user's email and a 200 HTTP status
-    return jsonify({"email": user.email}), 200
+    return _json_response({"email": g.user.email}, 200)
 
 
 @app.route('/reset_password', methods=['POST'])
@@ -141,7 +204,7 @@ def get_reset_password_token() -> jsonify:
 
     # Check if the email is provided
     if not email:
-        return jsonify({"message": "email field is required"}), 400
+        return _ERR_EMAIL
 
     try:
         # Generate a reset token through the AUTH object
@@ -149,7 +212,7 @@ def get_reset_password_token() -> jsonify:
         return jsonify({"email": email, "reset_token": reset_token}), 200
     except ValueError:
         # If the email is not registered, respond with 403
-        return jsonify({"message": "email not registered"}), 403
+        return _ERR_NOT_REGISTERED
 
 
 @app.route('/reset_password', methods=['PUT'])
@@ -166,9 +229,7 @@ def update_password() -> jsonify:
 
     # Check if all required fields are provided
     if not email or not reset_token or not new_password:
-        return jsonify({
-            "message": "email, reset_token, or new_password missing"
-        }), 400
+        return _ERR_RESET_FIELDS
 
     try:
         # Update the password using the AUTH object
@@ -176,7 +237,7 @@ def update_password() -> jsonify:
         return jsonify({"email": email, "message": "Password updated"}), 200
     except ValueError:
         # If the reset token is invalid, respond with 403
-        return jsonify({"message": "Invalid reset token"}), 403
+        return _ERR_RESET_TOKEN
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ This module defines the User class representing the 'users' table
 in the database.
 """
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, LargeBinary, String
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -20,18 +20,28 @@ class User(Base):
         id (int): The unique identifier for the user.
         email (str): The user's email address.
         hashed_password (str): The user's hashed password.
-        session_id (str): The user's session ID, if any.
-        reset_token (str): The user's password reset token, if any.
+        session_id (bytes): The 16 bytes of the user's session UUID, if any.
+        reset_token (bytes): The 16 bytes of the user's password reset
+            UUID, if any.
     """
 
     __tablename__ = 'users'
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
-    email: str = Column(String(250), nullable=False)
-    hashed_password: str = Column(String(250), nullable=False)
-    session_id: str = Column(String(250), nullable=True)
-    reset_token: str = Column(String(250), nullable=True)
+    # Unique index: lookups by email don't scan the table
+    email: str = Column(String(250), nullable=False, unique=True)
+    # bcrypt hashes are always 60 characters
+    hashed_password: str = Column(String(60), nullable=False)
+    # Indexed: every profile/logout and password reset looks them up.
+    # UUIDs are stored as their 16 bytes, not as 36 characters.
+    session_id: bytes = Column(LargeBinary(16), nullable=True, index=True)
+    reset_token: bytes = Column(LargeBinary(16), nullable=True, index=True)
 
     def __repr__(self) -> str:
         """Return a string representation of the User instance."""
         return f"<User(id={self.id}, email={self.email})>"
+
+
+# Column names of users, the attributes DB.update_user accepts
+VALID_ATTRIBUTES = frozenset(column.name
+                             for column in User.__table__.columns)